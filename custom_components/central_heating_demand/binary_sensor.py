@@ -1,9 +1,7 @@
 """Binary sensor platform for the central heating demand integration."""
 from __future__ import annotations
 
-import asyncio
 import logging
-import math
 
 import voluptuous as vol
 
@@ -11,18 +9,14 @@ from homeassistant.components.binary_sensor import (
     PLATFORM_SCHEMA,
     BinarySensorEntity,
 )
-from homeassistant.const import EVENT_HOMEASSISTANT_START
-from homeassistant.core import (
-    Event,
-    HomeAssistant,
-    State,
-    callback,
-)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-from homeassistant.helpers.event import async_track_state_change_event
 import homeassistant.helpers.config_validation as cv
 
+from .coordinator import HVAC_MODE_HEAT, HVAC_MODE_OFF, HeatingDemandCoordinator
+
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "central_heating_demand"
@@ -34,6 +28,9 @@ CONF_HYSTERESIS = "hysteresis"
 CONF_AWAY_TEMP = "away_temp"
 CONF_ZONE_ENTITY_ID = "zone_entity_id"
 
+# Coalesce heater commands from bursts of TRV updates (seconds)
+HEATER_COOLDOWN = 0.2
+
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
         vol.Required(CONF_TRV_CLIMATE_ENTITIES): vol.All(
@@ -62,15 +59,24 @@ async def async_setup_platform(
     zone_entity_id: str | None = config.get(CONF_ZONE_ENTITY_ID)
     hysteresis: float = config[CONF_HYSTERESIS]
 
+    # Share one coordinator per TRV set so the demand is only calculated once
+    coordinators: dict = hass.data.setdefault(DOMAIN, {})
+    key = (tuple(sorted(trv_climate_entities)), zone_entity_id, away_temp, hysteresis)
+    coordinator = coordinators.get(key)
+    if coordinator is None:
+        coordinator = coordinators[key] = HeatingDemandCoordinator(
+            hass, trv_climate_entities, zone_entity_id, away_temp, hysteresis
+        )
+
     async_add_entities(
         [
             CentralHeatingDemandBinarySensor(
                 hass,
+                coordinator,
                 trv_climate_entities,
                 heater_entity_id,
                 minimum_temperature,
                 away_temp,
-                zone_entity_id,
                 hysteresis,
             )
         ]
@@ -87,31 +93,32 @@ class CentralHeatingDemandBinarySensor(BinarySensorEntity):
     def __init__(
         self,
         hass: HomeAssistant,
+        coordinator: HeatingDemandCoordinator,
         trv_climate_entities: list[str],
         heater_entity_id: str | None,
         minimum_temperature: float,
         away_temp: float,
-        zone_entity_id: str | None,
         hysteresis: float,
     ) -> None:
         """Initialize the sensor."""
         self.hass = hass
-        self._trv_climate_entities = trv_climate_entities
+        self._coordinator = coordinator
+        self._trv_climate_entities = tuple(trv_climate_entities)
         self._heater_entity_id = heater_entity_id
         self._minimum_temperature = minimum_temperature
         self._away_temp = away_temp
-        self._zone_entity_id = zone_entity_id
         self._hysteresis = hysteresis
-        self._is_heating_demanded = False
-        self._max_demand_delta = 0.0
-        self._max_demand_current_temperature = None
-        self._max_demand_target_temperature = None
-        self._max_demand_trv_entity_id = None
         self._last_sent_target_temperature = None
         self._last_sent_hvac_mode = None
-        self._max_demand_trv_name = None
-        self._is_away = False
-        self._heater_lock = asyncio.Lock()
+        self._pending_target_temperature = None
+        self._pending_hvac_mode = None
+        self._heater_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=HEATER_COOLDOWN,
+            immediate=True,
+            function=self._async_control_heater,
+        )
 
     @property
     def unique_id(self) -> str:
@@ -129,262 +136,104 @@ class CentralHeatingDemandBinarySensor(BinarySensorEntity):
 
     async def async_added_to_hass(self) -> None:
         """Register callbacks when entity is added."""
-        # Validate TRV entities at startup
-        missing_entities = [
-            eid for eid in self._trv_climate_entities
-            if not self.hass.states.get(eid)
-        ]
-        if missing_entities:
-            _LOGGER.warning(
-                "TRV entities not found at startup (may appear later): %s",
-                missing_entities
-            )
-
         self.async_on_remove(
-            async_track_state_change_event(
-                self.hass, self._trv_climate_entities, self._async_trv_state_listener
-            )
+            self._coordinator.async_add_listener(self._handle_coordinator_update)
         )
+        self.async_on_remove(self._heater_debouncer.async_shutdown)
 
-        if self._zone_entity_id:
-            self.async_on_remove(
-                async_track_state_change_event(
-                    self.hass, [self._zone_entity_id], self._async_zone_state_listener
-                )
-            )
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated demand from the coordinator."""
+        # Control the heater if configured
+        if self._heater_entity_id:
+            result = self._coordinator.result
+            target_hvac_mode = HVAC_MODE_OFF
+            target_to_set = self._minimum_temperature
 
-        # Initial state update when Home Assistant starts
-        self.async_on_remove(
-            self.hass.bus.async_listen_once(
-                EVENT_HOMEASSISTANT_START, self._async_update_on_start
-            )
-        )
+            if result.is_demanded:
+                target_hvac_mode = HVAC_MODE_HEAT
+                if result.max_demand_target_temperature is not None:
+                    target_to_set = result.max_demand_target_temperature
+
+            # Only the latest command within the cooldown window is sent
+            self._pending_target_temperature = target_to_set
+            self._pending_hvac_mode = target_hvac_mode
+            if (
+                self._last_sent_target_temperature != target_to_set
+                or self._last_sent_hvac_mode != target_hvac_mode
+            ):
+                self._heater_debouncer.async_schedule_call()
 
-    @callback
-    def _async_update_on_start(self, event: Event) -> None:
-        """Update state when Home Assistant starts."""
-        self._async_update_heating_demand()
         self.async_write_ha_state()
 
-    @callback
-    def _async_zone_state_listener(self, event: Event) -> None:
-        """Handle Zone state changes."""
-        old_state: State | None = event.data.get("old_state")
-        new_state: State | None = event.data.get("new_state")
-        if old_state and new_state and old_state.state == new_state.state:
+    async def _async_control_heater(self) -> None:
+        """Send the pending command to the heater if it has changed."""
+        target_temp = self._pending_target_temperature
+        target_hvac_mode = self._pending_hvac_mode
+        send_temperature = self._last_sent_target_temperature != target_temp
+        send_hvac_mode = self._last_sent_hvac_mode != target_hvac_mode
+
+        # Decide before the first await, so a no-op run finishes synchronously
+        if not send_temperature and not send_hvac_mode:
             return
-        self._async_update_heating_demand()
-        self.async_write_ha_state()
 
-    @callback
-    def _async_trv_state_listener(self, event: Event) -> None:
-        """Handle TRV state changes."""
-        old_state: State | None = event.data.get("old_state")
-        new_state: State | None = event.data.get("new_state")
-
-        # Only proceed if there's a meaningful state change for hvac_action or temperature
-        if (
-            old_state
-            and new_state
-            and (
-                old_state.state != new_state.state
-                or old_state.attributes.get("hvac_action")
-                != new_state.attributes.get("hvac_action")
-                or old_state.attributes.get("current_temperature")
-                != new_state.attributes.get("current_temperature")
-                or old_state.attributes.get("temperature")
-                != new_state.attributes.get("temperature")
+        # 1. Handle Temperature Change
+        if send_temperature:
+            _LOGGER.debug(
+                "Setting heater %s temperature to %s", self._heater_entity_id, target_temp
             )
-        ):
-            self._async_update_heating_demand()
-            self.async_write_ha_state()
-        elif not old_state and new_state: # Initial state set
-            self._async_update_heating_demand()
-            self.async_write_ha_state()
-
-
-    @callback
-    def _async_update_heating_demand(self) -> None:
-        """Calculate if any TRV is currently demanding heating and find the max demand."""
-        previous_demand_state = self._is_heating_demanded
-        demanding_trvs = 0
-        max_delta = float('-inf')
-        leader_entity_id = None
-        leader_current_temp = None
-        leader_target_temp = None
-        leader_friendly_name = None
-
-        # Track if we found at least one valid TRV to report on
-        valid_trv_found = False
-
-        # Check Away Mode
-        self._is_away = False
-        if self._zone_entity_id:
-            zone_state = self.hass.states.get(self._zone_entity_id)
-            if zone_state and zone_state.state == "0":
-                self._is_away = True
-
-        for entity_id in self._trv_climate_entities:
-            state = self.hass.states.get(entity_id)
-            if not state:
-                _LOGGER.debug("TRV entity %s not found", entity_id)
-                continue
-
-            hvac_action = state.attributes.get("hvac_action")
-            current_temperature = state.attributes.get("current_temperature")
-            target_temperature = state.attributes.get("temperature")
-            trv_state = state.state
-            friendly_name = state.attributes.get("friendly_name")
-
-            # Ensure we have valid numbers to work with
-            if current_temperature is None or target_temperature is None:
-                continue
-
-            # Validate temperature values are finite numbers
-            if not math.isfinite(current_temperature) or not math.isfinite(target_temperature):
-                _LOGGER.warning(
-                    "Invalid temperature value for %s: current=%s, target=%s",
-                    entity_id, current_temperature, target_temperature
+            try:
+                await self.hass.services.async_call(
+                    "climate",
+                    "set_temperature",
+                    {
+                        "entity_id": self._heater_entity_id,
+                        "temperature": target_temp,
+                    },
+                    blocking=False,
                 )
-                continue
-
-            valid_trv_found = True
-
-            # Calculate demand delta (Target - Current)
-            # A positive delta means heat is needed.
-            # Implement Away Mode Logic: override target with away_temp if away
-            effective_target_temperature = target_temperature
-            if self._is_away:
-                effective_target_temperature = self._away_temp
-
-            delta = effective_target_temperature - current_temperature
-
-            # Check for binary demand with hysteresis
-            # Turn ON when delta > hysteresis, turn OFF when delta <= 0
-            is_demanding = False
-            if hvac_action == "heating" or (
-                trv_state == "heat"
-                and delta > self._hysteresis
-            ):
-                is_demanding = True
-                demanding_trvs += 1
-
-            # Determine if this TRV has the highest demand (largest deficit)
-            # We track the max delta even if it's negative (closest to target)
-            # so we always report *something* reasonable to the OpenTherm thermostat.
-            if delta > max_delta:
-                max_delta = delta
-                leader_entity_id = entity_id
-                leader_current_temp = current_temperature
-                leader_target_temp = effective_target_temperature
-                leader_friendly_name = friendly_name
-
-        self._is_heating_demanded = demanding_trvs > 0
-
-        if valid_trv_found and leader_entity_id:
-            # User Request: If demand delta is negative, show it as zero.
-            self._max_demand_delta = max(0.0, max_delta)
-            self._max_demand_current_temperature = leader_current_temp
-            self._max_demand_target_temperature = leader_target_temp
-            self._max_demand_trv_entity_id = leader_entity_id
-            self._max_demand_trv_name = leader_friendly_name
-        else:
-            # Fallback if no valid TRVs found
-            if not valid_trv_found:
-                _LOGGER.warning(
-                    "No valid TRV entities found with temperature data. "
-                    "Heating demand cannot be calculated."
-                )
-            self._max_demand_delta = 0.0
-            self._max_demand_current_temperature = None
-            self._max_demand_target_temperature = None
-            self._max_demand_trv_entity_id = None
-            self._max_demand_trv_name = None
-
-        # Log state transitions at info level for easier debugging
-        if self._is_heating_demanded != previous_demand_state:
-            if self._is_heating_demanded:
-                _LOGGER.info(
-                    "Heating demand ON - max demand: %s at +%.1f°C",
-                    self._max_demand_trv_name or self._max_demand_trv_entity_id,
-                    self._max_demand_delta
-                )
-            else:
-                _LOGGER.info("Heating demand OFF - all TRVs satisfied")
-
-        # Control the heater if configured
-        if self._heater_entity_id:
-            target_hvac_mode = "off"
-            target_to_set = self._minimum_temperature
-
-            if self._is_heating_demanded:
-                target_hvac_mode = "heat"
-                if self._max_demand_target_temperature is not None:
-                    target_to_set = self._max_demand_target_temperature
-
-            self.hass.async_create_task(
-                self._async_control_heater(target_to_set, target_hvac_mode)
+                self._last_sent_target_temperature = target_temp
+            except Exception as e:
+                _LOGGER.error("Failed to set heater temperature: %s", e)
+
+        # 2. Handle HVAC Mode Change
+        if send_hvac_mode:
+            _LOGGER.debug(
+                "Setting heater %s hvac_mode to %s", self._heater_entity_id, target_hvac_mode
             )
-
-    async def _async_control_heater(self, target_temp: float, target_hvac_mode: str) -> None:
-        """Send command to heater if configuration has changed."""
-        async with self._heater_lock:
-            # 1. Handle Temperature Change
-            if self._last_sent_target_temperature != target_temp:
-                _LOGGER.debug(
-                    "Setting heater %s temperature to %s", self._heater_entity_id, target_temp
-                )
-                try:
-                    await self.hass.services.async_call(
-                        "climate",
-                        "set_temperature",
-                        {
-                            "entity_id": self._heater_entity_id,
-                            "temperature": target_temp,
-                        },
-                        blocking=False,
-                    )
-                    self._last_sent_target_temperature = target_temp
-                except Exception as e:
-                    _LOGGER.error("Failed to set heater temperature: %s", e)
-
-            # 2. Handle HVAC Mode Change
-            if self._last_sent_hvac_mode != target_hvac_mode:
-                _LOGGER.debug(
-                    "Setting heater %s hvac_mode to %s", self._heater_entity_id, target_hvac_mode
+            try:
+                await self.hass.services.async_call(
+                    "climate",
+                    "set_hvac_mode",
+                    {
+                        "entity_id": self._heater_entity_id,
+                        "hvac_mode": target_hvac_mode,
+                    },
+                    blocking=False,
                 )
-                try:
-                    await self.hass.services.async_call(
-                        "climate",
-                        "set_hvac_mode",
-                        {
-                            "entity_id": self._heater_entity_id,
-                            "hvac_mode": target_hvac_mode,
-                        },
-                        blocking=False,
-                    )
-                    self._last_sent_hvac_mode = target_hvac_mode
-                except Exception as e:
-                    _LOGGER.error("Failed to set heater hvac_mode: %s", e)
+                self._last_sent_hvac_mode = target_hvac_mode
+            except Exception as e:
+                _LOGGER.error("Failed to set heater hvac_mode: %s", e)
 
 
     @property
     def is_on(self) -> bool:
         """Return true if the binary sensor is on."""
-        return self._is_heating_demanded
+        return self._coordinator.result.is_demanded
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
+        result = self._coordinator.result
         return {
             "trv_climate_entities": self._trv_climate_entities,
-            "max_demand_delta": self._max_demand_delta,
-            "max_demand_current_temperature": self._max_demand_current_temperature,
-            "max_demand_target_temperature": self._max_demand_target_temperature,
-            "max_demand_trv_entity_id": self._max_demand_trv_entity_id,
-            "max_demand_trv_name": self._max_demand_trv_name,
+            "max_demand_delta": result.max_demand_delta,
+            "max_demand_current_temperature": result.max_demand_current_temperature,
+            "max_demand_target_temperature": result.max_demand_target_temperature,
+            "max_demand_trv_entity_id": result.max_demand_trv_entity_id,
+            "max_demand_trv_name": result.max_demand_trv_name,
             "heater_entity_id": self._heater_entity_id,
-            "away_mode": self._is_away,
+            "away_mode": result.is_away,
             "away_temperature": self._away_temp,
             "hysteresis": self._hysteresis,
         }
@@ -0,0 +1,373 @@
+"""Shared heating demand calculation for the central heating demand integration."""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+import logging
+import math
+from typing import Any, NamedTuple
+
+from homeassistant.const import EVENT_HOMEASSISTANT_START
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers.event import (
+    EventStateChangedData,
+    async_track_state_change_event,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+HVAC_ACTION_HEATING = "heating"
+HVAC_MODE_HEAT = "heat"
+HVAC_MODE_OFF = "off"
+ZONE_EMPTY = "0"
+
+
+class TrvReading(NamedTuple):
+    """The parts of a TRV state that affect the heating demand."""
+
+    hvac_action: Any
+    current: Any
+    target: Any
+    state: str
+
+
+def _read_trv(state: State) -> TrvReading:
+    """Extract the demand relevant values from a TRV state."""
+    attrs = state.attributes
+    return TrvReading(
+        attrs.get("hvac_action"),
+        attrs.get("current_temperature"),
+        attrs.get("temperature"),
+        state.state,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class DemandResult:
+    """Immutable snapshot of the calculated heating demand."""
+
+    is_demanded: bool = False
+    max_demand_delta: float = 0.0
+    max_demand_current_temperature: float | None = None
+    max_demand_target_temperature: float | None = None
+    max_demand_trv_entity_id: str | None = None
+    max_demand_trv_name: str | None = None
+    is_away: bool = False
+
+
+class HeatingDemandCoordinator:
+    """Track TRV states and calculate the heating demand once for all listeners."""
+
+    __slots__ = (
+        "hass",
+        "_trv_climate_entities",
+        "_trv_set",
+        "_zone_entity_id",
+        "_away_temp",
+        "_hysteresis",
+        "_is_away",
+        "_listeners",
+        "_unsub_state",
+        "_unsub_start",
+        "_leader_entity_id",
+        "_leader_delta",
+        "_demanding_trvs",
+        "result",
+    )
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        trv_climate_entities: list[str],
+        zone_entity_id: str | None,
+        away_temp: float,
+        hysteresis: float,
+    ) -> None:
+        """Initialize the coordinator."""
+        self.hass = hass
+        self._trv_climate_entities = tuple(trv_climate_entities)
+        self._trv_set = frozenset(trv_climate_entities)
+        self._zone_entity_id = zone_entity_id
+        self._away_temp = away_temp
+        self._hysteresis = hysteresis
+        self._is_away = False
+        self._listeners: set[CALLBACK_TYPE] = set()
+        self._unsub_state: CALLBACK_TYPE | None = None
+        self._unsub_start: CALLBACK_TYPE | None = None
+        # Bookkeeping from the last full scan, used for incremental updates
+        self._leader_entity_id: str | None = None
+        self._leader_delta = float('-inf')
+        self._demanding_trvs: set[str] = set()
+        self.result = DemandResult()
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for demand updates and return a callback to stop listening."""
+        start_tracking = not self._listeners
+        self._listeners.add(update_callback)
+        if start_tracking:
+            self._async_start_tracking()
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the update listener."""
+            self._listeners.discard(update_callback)
+            if not self._listeners:
+                self._async_stop_tracking()
+
+        return remove_listener
+
+    @callback
+    def _async_start_tracking(self) -> None:
+        """Subscribe to TRV and zone state changes."""
+        # Validate TRV entities at startup
+        missing_entities = [
+            eid for eid in self._trv_climate_entities
+            if not self.hass.states.get(eid)
+        ]
+        if missing_entities:
+            _LOGGER.warning(
+                "TRV entities not found at startup (may appear later): %s",
+                missing_entities
+            )
+
+        tracked_entities = list(self._trv_climate_entities)
+        if self._zone_entity_id:
+            zone_state = self.hass.states.get(self._zone_entity_id)
+            self._is_away = zone_state is not None and zone_state.state == ZONE_EMPTY
+            tracked_entities.append(self._zone_entity_id)
+
+        self._unsub_state = async_track_state_change_event(
+            self.hass, tracked_entities, self._async_state_listener
+        )
+
+        if self.hass.is_running:
+            # The start event has already fired (e.g. the entity was re-added),
+            # so replace any result left over from before tracking stopped
+            self._async_set_result(self._recompute(), force=True)
+        else:
+            # Initial state update when Home Assistant starts
+            self._unsub_start = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_START, self._async_update_on_start
+            )
+
+    @callback
+    def _async_stop_tracking(self) -> None:
+        """Unsubscribe from all state changes."""
+        if self._unsub_state:
+            self._unsub_state()
+            self._unsub_state = None
+        if self._unsub_start:
+            self._unsub_start()
+            self._unsub_start = None
+
+    @callback
+    def _async_update_on_start(self, event: Event) -> None:
+        """Update demand when Home Assistant starts."""
+        self._unsub_start = None
+        # Always notify at startup so the heater receives its initial command
+        self._async_set_result(self._recompute(), force=True)
+
+    @callback
+    def _async_state_listener(self, event: Event[EventStateChangedData]) -> None:
+        """Route state changes to the TRV or zone handler."""
+        data = event.data
+        entity_id = data["entity_id"]
+        if entity_id in self._trv_set:
+            self._async_trv_state_listener(
+                entity_id, data["old_state"], data["new_state"]
+            )
+        else:
+            self._async_zone_state_listener(data["old_state"], data["new_state"])
+
+    @callback
+    def _async_zone_state_listener(
+        self, old_state: State | None, new_state: State | None
+    ) -> None:
+        """Handle Zone state changes."""
+        if old_state and new_state and old_state.state == new_state.state:
+            return
+        self._is_away = new_state is not None and new_state.state == ZONE_EMPTY
+        self._async_refresh()
+
+    @callback
+    def _async_trv_state_listener(
+        self, entity_id: str, old_state: State | None, new_state: State | None
+    ) -> None:
+        """Handle TRV state changes."""
+        if not new_state:
+            # The TRV was removed: drop it from the demand and leader bookkeeping
+            if old_state:
+                self._async_refresh()
+            return
+
+        # Only proceed if there's a meaningful state change for hvac_action or temperature
+        new_reading = _read_trv(new_state)
+        if old_state and _read_trv(old_state) == new_reading:
+            return
+
+        # The leader changed, so any other TRV may have taken over: rescan all
+        if entity_id == self._leader_entity_id:
+            self._async_refresh()
+            return
+
+        away_target = self._away_temp if self._is_away else None
+        evaluation = self._evaluate_trv(entity_id, new_reading, away_target)
+        if evaluation is not None and evaluation[0] > self._leader_delta:
+            # The changed TRV toppled the leader
+            self._async_refresh()
+            return
+
+        # The leader is unaffected, only this TRV's own demand may have changed
+        is_demanding = evaluation is not None and evaluation[3]
+        if is_demanding == (entity_id in self._demanding_trvs):
+            return
+        if is_demanding:
+            self._demanding_trvs.add(entity_id)
+        else:
+            self._demanding_trvs.discard(entity_id)
+        self._async_set_result(
+            replace(self.result, is_demanded=bool(self._demanding_trvs))
+        )
+
+    @callback
+    def _async_refresh(self) -> None:
+        """Recalculate the demand for all TRVs and notify all listeners."""
+        self._async_set_result(self._recompute())
+
+    @callback
+    def _async_set_result(self, result: DemandResult, force: bool = False) -> None:
+        """Store a new demand result and notify listeners if it changed."""
+        previous_result = self.result
+        if result == previous_result and not force:
+            return
+        self.result = result
+
+        # Log state transitions at info level for easier debugging
+        if result.is_demanded != previous_result.is_demanded:
+            if result.is_demanded:
+                _LOGGER.info(
+                    "Heating demand ON - max demand: %s at +%.1f°C",
+                    result.max_demand_trv_name or result.max_demand_trv_entity_id,
+                    result.max_demand_delta
+                )
+            else:
+                _LOGGER.info("Heating demand OFF - all TRVs satisfied")
+
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _evaluate_trv(
+        self, entity_id: str, reading: TrvReading, away_target: float | None
+    ) -> tuple[float, float, float, bool] | None:
+        """Return the delta, current and target temperature and demand of a TRV.
+
+        away_target overrides the TRV target temperature while away.
+        Returns None if the TRV doesn't report usable temperatures.
+        """
+        hvac_action, current_value, target_value, trv_state = reading
+
+        # Ensure we have valid numbers to work with; some integrations
+        # report temperatures as strings, and missing values are None
+        try:
+            current_temperature = float(current_value)
+            target_temperature = float(target_value)
+        except (TypeError, ValueError):
+            return None
+
+        # Validate temperature values are finite numbers
+        if not math.isfinite(current_temperature) or not math.isfinite(target_temperature):
+            _LOGGER.warning(
+                "Invalid temperature value for %s: current=%s, target=%s",
+                entity_id, current_value, target_value
+            )
+            return None
+
+        # Calculate demand delta (Target - Current)
+        # A positive delta means heat is needed.
+        # Implement Away Mode Logic: override target with away_temp if away
+        effective_target_temperature = (
+            target_temperature if away_target is None else away_target
+        )
+
+        delta = effective_target_temperature - current_temperature
+
+        # Check for binary demand with hysteresis
+        # Turn ON when delta > hysteresis, turn OFF when delta <= 0
+        is_demanding = hvac_action == HVAC_ACTION_HEATING or (
+            trv_state == HVAC_MODE_HEAT
+            and delta > self._hysteresis
+        )
+
+        return delta, current_temperature, effective_target_temperature, is_demanding
+
+    def _recompute(self) -> DemandResult:
+        """Calculate if any TRV is currently demanding heating and find the max demand."""
+        demanding_trvs: set[str] = set()
+        max_delta = float('-inf')
+        leader_entity_id = None
+        leader_current_temp = None
+        leader_target_temp = None
+        leader_state = None
+
+        # Track if we found at least one valid TRV to report on
+        valid_trv_found = False
+
+        # Away Mode is kept up to date by the zone listener
+        is_away = self._is_away
+        away_target = self._away_temp if is_away else None
+
+        for entity_id in self._trv_climate_entities:
+            state = self.hass.states.get(entity_id)
+            if not state:
+                _LOGGER.debug("TRV entity %s not found", entity_id)
+                continue
+
+            evaluation = self._evaluate_trv(entity_id, _read_trv(state), away_target)
+            if evaluation is None:
+                continue
+
+            valid_trv_found = True
+            delta, current_temperature, target_temperature, is_demanding = evaluation
+
+            if is_demanding:
+                demanding_trvs.add(entity_id)
+
+            # Determine if this TRV has the highest demand (largest deficit)
+            # We track the max delta even if it's negative (closest to target)
+            # so we always report *something* reasonable to the OpenTherm thermostat.
+            if delta > max_delta:
+                max_delta = delta
+                leader_entity_id = entity_id
+                leader_current_temp = current_temperature
+                leader_target_temp = target_temperature
+                leader_state = state
+
+        self._demanding_trvs = demanding_trvs
+        self._leader_entity_id = leader_entity_id
+        self._leader_delta = max_delta
+
+        if valid_trv_found and leader_entity_id and leader_state:
+            # User Request: If demand delta is negative, show it as zero.
+            return DemandResult(
+                is_demanded=bool(demanding_trvs),
+                max_demand_delta=max(0.0, max_delta),
+                max_demand_current_temperature=leader_current_temp,
+                max_demand_target_temperature=leader_target_temp,
+                max_demand_trv_entity_id=leader_entity_id,
+                max_demand_trv_name=leader_state.attributes.get("friendly_name"),
+                is_away=is_away,
+            )
+
+        # Fallback if no valid TRVs found
+        if not valid_trv_found:
+            _LOGGER.warning(
+                "No valid TRV entities found with temperature data. "
+                "Heating demand cannot be calculated."
+            )
+        return DemandResult(is_demanded=bool(demanding_trvs), is_away=is_away)